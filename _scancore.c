@@ -0,0 +1,231 @@
+/*
+ * _scancore - epoll-driven connect scan core for port_scanner.py
+ *
+ * Runs the connect-only phase of a scan entirely in C: a sliding window
+ * of non-blocking sockets is kept in flight and completions are reaped
+ * with epoll, returning to Python only once every port is classified.
+ *
+ * Build (Linux):
+ *     cc -O2 -shared -fPIC -o _scancore.so _scancore.c
+ */
+
+#define _GNU_SOURCE
+#include <arpa/inet.h>
+#include <errno.h>
+#include <netinet/in.h>
+#include <netinet/tcp.h>
+#include <stdint.h>
+#include <stdlib.h>
+#include <string.h>
+#include <sys/epoll.h>
+#include <sys/socket.h>
+#include <time.h>
+#include <unistd.h>
+
+/* SYN retransmissions the kernel attempts before abandoning a handshake */
+#define SYN_RETRIES 2
+
+/* Maximum events reaped per epoll_wait call */
+#define MAX_EVENTS 256
+
+/* Per-port results written to open_out */
+#define PORT_CLOSED    0
+#define PORT_OPEN      1
+#define PORT_UNSCANNED 2  /* no socket could be created for the attempt */
+
+struct slot {
+    int fd;          /* -1 when the slot is free */
+    int index;       /* position of the port in the caller's array */
+    long deadline;   /* monotonic milliseconds */
+};
+
+static long now_ms(void)
+{
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec * 1000L + ts.tv_nsec / 1000000L;
+}
+
+/* Creates a non-blocking TCP socket tuned like create_scan_socket() */
+static int create_scan_socket(int timeout_ms)
+{
+    int fd = socket(AF_INET, SOCK_STREAM | SOCK_NONBLOCK | SOCK_CLOEXEC, 0);
+    if (fd < 0)
+        return -1;
+
+    struct linger linger = { 1, 0 };
+    int one = 1;
+    int syn_retries = SYN_RETRIES;
+    unsigned int user_timeout = timeout_ms > 0 ? (unsigned int)timeout_ms : 1;
+
+    setsockopt(fd, SOL_SOCKET, SO_LINGER, &linger, sizeof(linger));
+    setsockopt(fd, SOL_SOCKET, SO_REUSEADDR, &one, sizeof(one));
+    setsockopt(fd, SOL_SOCKET, SO_REUSEPORT, &one, sizeof(one));
+    setsockopt(fd, IPPROTO_TCP, TCP_USER_TIMEOUT, &user_timeout, sizeof(user_timeout));
+    setsockopt(fd, IPPROTO_TCP, TCP_SYNCNT, &syn_retries, sizeof(syn_retries));
+    return fd;
+}
+
+static void release_slot(struct slot *slots, int *free_stack, int *free_count, int id)
+{
+    close(slots[id].fd);
+    slots[id].fd = -1;
+    free_stack[(*free_count)++] = id;
+}
+
+/*
+ * Checks which of the given ports accept a TCP connection.
+ *
+ * target:       dotted-quad IPv4 address
+ * ports:        array of count port numbers, each in 1-65535
+ * timeout_ms:   per-connection timeout in milliseconds
+ * max_inflight: maximum number of connections in flight at once
+ * open_out:     array of count bytes, set to PORT_OPEN, PORT_CLOSED or
+ *               PORT_UNSCANNED for each port
+ *
+ * Returns 0 on success, or -1 with errno set on failure (EINVAL for a bad
+ * address or port number).
+ */
+int scan_ports(const char *target, const int *ports, int count, int timeout_ms,
+               int max_inflight, unsigned char *open_out)
+{
+    struct sockaddr_in addr;
+    memset(&addr, 0, sizeof(addr));
+    addr.sin_family = AF_INET;
+    if (inet_pton(AF_INET, target, &addr.sin_addr) != 1) {
+        errno = EINVAL;
+        return -1;
+    }
+    for (int index = 0; index < count; index++) {
+        if (ports[index] < 1 || ports[index] > 65535) {
+            errno = EINVAL;
+            return -1;
+        }
+    }
+
+    if (count <= 0)
+        return 0;
+    memset(open_out, PORT_CLOSED, (size_t)count);
+    if (max_inflight > count)
+        max_inflight = count;
+    if (max_inflight < 1)
+        max_inflight = 1;
+
+    int epfd = epoll_create1(EPOLL_CLOEXEC);
+    if (epfd < 0)
+        return -1;
+
+    struct slot *slots = calloc((size_t)max_inflight, sizeof(*slots));
+    int *free_stack = calloc((size_t)max_inflight, sizeof(*free_stack));
+    if (!slots || !free_stack) {
+        free(slots);
+        free(free_stack);
+        close(epfd);
+        errno = ENOMEM;
+        return -1;
+    }
+
+    int free_count = 0;
+    for (int id = max_inflight - 1; id >= 0; id--) {
+        slots[id].fd = -1;
+        free_stack[free_count++] = id;
+    }
+
+    struct epoll_event events[MAX_EVENTS];
+    int next = 0;
+    int inflight = 0;
+
+    while (next < count || inflight > 0) {
+        /* Keep the window full */
+        while (next < count && free_count > 0) {
+            int fd = create_scan_socket(timeout_ms);
+            if (fd < 0) {
+                /* Out of descriptors: wait for an in-flight attempt to finish */
+                if ((errno == EMFILE || errno == ENFILE) && inflight > 0)
+                    break;
+                open_out[next++] = PORT_UNSCANNED;
+                continue;
+            }
+
+            int index = next++;
+            addr.sin_port = htons((uint16_t)ports[index]);
+            if (connect(fd, (struct sockaddr *)&addr, sizeof(addr)) == 0) {
+                open_out[index] = PORT_OPEN;
+                close(fd);
+                continue;
+            }
+            if (errno != EINPROGRESS) {
+                /* Port is closed */
+                close(fd);
+                continue;
+            }
+
+            int id = free_stack[--free_count];
+            slots[id].fd = fd;
+            slots[id].index = index;
+            slots[id].deadline = now_ms() + timeout_ms;
+
+            struct epoll_event ev;
+            ev.events = EPOLLOUT;
+            ev.data.u32 = (unsigned int)id;
+            if (epoll_ctl(epfd, EPOLL_CTL_ADD, fd, &ev) < 0) {
+                open_out[index] = PORT_UNSCANNED;
+                release_slot(slots, free_stack, &free_count, id);
+                continue;
+            }
+            inflight++;
+        }
+
+        if (inflight == 0)
+            continue;
+
+        /* Sleep no longer than the earliest pending deadline */
+        long now = now_ms();
+        long wait_ms = timeout_ms;
+        for (int id = 0; id < max_inflight; id++) {
+            if (slots[id].fd >= 0 && slots[id].deadline - now < wait_ms)
+                wait_ms = slots[id].deadline - now;
+        }
+        if (wait_ms < 0)
+            wait_ms = 0;
+
+        int ready = epoll_wait(epfd, events, MAX_EVENTS, (int)wait_ms);
+        if (ready < 0 && errno != EINTR) {
+            int saved = errno;
+            for (int id = 0; id < max_inflight; id++) {
+                if (slots[id].fd >= 0)
+                    close(slots[id].fd);
+            }
+            free(slots);
+            free(free_stack);
+            close(epfd);
+            errno = saved;
+            return -1;
+        }
+
+        for (int i = 0; i < ready; i++) {
+            int id = (int)events[i].data.u32;
+            int so_error = 0;
+            socklen_t len = sizeof(so_error);
+            if (getsockopt(slots[id].fd, SOL_SOCKET, SO_ERROR, &so_error, &len) == 0 && so_error == 0)
+                open_out[slots[id].index] = PORT_OPEN;
+            /* close() also removes the descriptor from the epoll set */
+            release_slot(slots, free_stack, &free_count, id);
+            inflight--;
+        }
+
+        /* Anything past its deadline is filtered */
+        now = now_ms();
+        for (int id = 0; id < max_inflight; id++) {
+            if (slots[id].fd >= 0 && slots[id].deadline <= now) {
+                release_slot(slots, free_stack, &free_count, id);
+                inflight--;
+            }
+        }
+    }
+
+    free(slots);
+    free(free_stack);
+    close(epfd);
+    return 0;
+}
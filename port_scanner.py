@@ -1,75 +1,1113 @@
 #!/usr/bin/env python3
 """
-Port Scanner - A multi-threaded port scanner with banner grabbing capabilities
+Port Scanner - An asynchronous port scanner with banner grabbing capabilities
 """
 
+import asyncio
+import atexit
+import ctypes
+import errno
+import os
+import queue
+import random
+import re
+import select
 import socket
+import struct
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
 import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from types import MappingProxyType
 from typing import Optional, Tuple
 
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+try:
+    import uvloop
+except ImportError:  # Optional high-performance event loop
+    uvloop = None
+
+
+# Concurrent connections allowed per requested "thread" now that scanning is
+# driven by a single event loop instead of one OS thread per port
+CONNECTIONS_PER_WORKER = 20
+
+# Valid TCP port numbers
+MIN_PORT = 1
+MAX_PORT = 65535
+
+# SYN retransmissions the kernel attempts before abandoning a handshake
+SYN_RETRIES = 2
+
+# Completed scans processed per reporting step, and ports between progress updates
+COMPLETION_BATCH_SIZE = 64
+PROGRESS_INTERVAL = 50
+
+# The native core reports back once per call, so ports are handed to it in
+# chunks of at least this many (and four windows' worth) to keep progress
+# moving without draining the connection window too often
+NATIVE_CHUNK_PORTS = 1024
+
+# TCP flags used to build SYN probes and classify the replies
+TCP_SYN = 0x02
+TCP_RST = 0x04
+SYN_ACK = 0x12
+
+# Bytes read when grabbing a banner; greetings like SSH-2.0-..., 220 ... and
+# HTTP status lines fit well within this
+BANNER_SIZE = 128
+
+# Seconds to keep listening for SYN scan replies after the last probe is sent
+SYN_SETTLE_TIME = 2.0
+
+# Common service names for well-known ports
+_SERVICES = MappingProxyType({
+    20: "FTP Data",
+    21: "FTP",
+    22: "SSH",
+    23: "Telnet",
+    25: "SMTP",
+    53: "DNS",
+    80: "HTTP",
+    110: "POP3",
+    143: "IMAP",
+    443: "HTTPS",
+    445: "SMB",
+    3306: "MySQL",
+    3389: "RDP",
+    5432: "PostgreSQL",
+    8080: "HTTP-Proxy",
+})
+
+# Banner fingerprints compiled once into a single anchored alternation; the
+# name of the matching group identifies the service
+_BANNER_SIGNATURES = re.compile(
+    r'(?P<SSH>SSH-\d)'
+    r'|(?P<HTTP>HTTP/\d)'
+    r'|(?P<SMTP>220[ -].*(?:SMTP|Postfix|Exim|Sendmail))'
+    r'|(?P<FTP>220[ -].*FTP)'
+    r'|(?P<POP3>\+OK)'
+    r'|(?P<IMAP>\* OK)'
+    r'|(?P<VNC>RFB \d{3}\.\d{3})',
+    re.IGNORECASE,
+)
+
+# Event loop shared by every scan in this process, created on first use
+_SCAN_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+# Optional compiled connect-phase core, built from _scancore.c
+SCAN_CORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '_scancore.so')
+
+# Per-port results reported by the native scan core
+CORE_PORT_CLOSED = 0
+CORE_PORT_OPEN = 1
+CORE_PORT_UNSCANNED = 2
+
+# Verified open connections kept for reuse by later scans of the same
+# (host, port) per worker, and the default cache size (four per default worker)
+CACHED_SOCKETS_PER_WORKER = 4
+SOCKET_CACHE_SIZE = 200
+
+# Descriptors left free for stdio and the event loop's own use
+DESCRIPTOR_HEADROOM = 32
+
+# Errors meaning the process or system is out of file descriptors, and how
+# long to wait for in-flight connections to release one before giving up
+DESCRIPTORS_EXHAUSTED = (errno.EMFILE, errno.ENFILE)
+DESCRIPTOR_WAIT = 5.0
+
+# Least recently used cache of open connections and the banner read from each
+_OPEN_SOCK_CACHE: "OrderedDict[Tuple[str, int], Tuple[socket.socket, Optional[str]]]" = OrderedDict()
+_OPEN_SOCK_CACHE_LOCK = threading.Lock()
+
+
+def create_scan_socket(timeout: float) -> socket.socket:
+    """
+    Creates a non-blocking TCP socket tuned for port scanning.
+    Closed sockets are reset instead of lingering in TIME_WAIT, and on
+    Linux the kernel is told to abort stalled handshakes at the scan
+    deadline instead of exhausting its default retransmission budget.
+    
+    Args:
+        timeout: Connection timeout in seconds
+    
+    Returns:
+        Non-blocking socket object
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        sock.setblocking(False)
+        # Abort with RST on close so local ports skip TIME_WAIT and can be
+        # reused immediately during large scans
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, 'SO_REUSEPORT'):
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        if hasattr(socket, 'TCP_USER_TIMEOUT'):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_USER_TIMEOUT, max(1, int(timeout * 1000)))
+        if hasattr(socket, 'TCP_SYNCNT'):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_SYNCNT, SYN_RETRIES)
+    except socket.error:
+        sock.close()
+        raise
+    return sock
+
+
+async def create_scan_socket_async(timeout: float) -> socket.socket:
+    """
+    Creates a scan socket, waiting for a descriptor to be released when
+    the process has run out of them rather than treating the port as closed.
+    
+    Args:
+        timeout: Connection timeout in seconds
+    
+    Returns:
+        Non-blocking socket object
+    
+    Raises:
+        OSError: If no socket could be created within DESCRIPTOR_WAIT seconds
+    """
+    deadline = time.monotonic() + DESCRIPTOR_WAIT
+    delay = 0.01
+    while True:
+        try:
+            return create_scan_socket(timeout)
+        except OSError as e:
+            if e.errno not in DESCRIPTORS_EXHAUSTED or time.monotonic() >= deadline:
+                raise
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 0.1)
+
+
+def is_socket_alive(sock: socket.socket) -> bool:
+    """
+    Checks without blocking whether a connected socket is still usable.
+    
+    Args:
+        sock: The connected non-blocking socket object
+    
+    Returns:
+        True if the peer has not closed the connection, False otherwise
+    """
+    try:
+        # Pending data means alive; an empty read means the peer closed it
+        return sock.recv(1, socket.MSG_PEEK) != b''
+    except BlockingIOError:
+        return True
+    except OSError:
+        return False
+
+
+def get_cached_socket(target_ip: str, port: int) -> Optional[Tuple[socket.socket, Optional[str]]]:
+    """
+    Returns a cached open connection to the target port if it is still alive.
+    Dead connections are evicted and closed.
+    
+    Args:
+        target_ip: The target IP address
+        port: The port number
+    
+    Returns:
+        Tuple containing (socket, banner) if a live connection is cached, None otherwise
+    """
+    key = (target_ip, port)
+    with _OPEN_SOCK_CACHE_LOCK:
+        entry = _OPEN_SOCK_CACHE.get(key)
+        if entry is None:
+            return None
+        if is_socket_alive(entry[0]):
+            _OPEN_SOCK_CACHE.move_to_end(key)
+            return entry
+        del _OPEN_SOCK_CACHE[key]
+    entry[0].close()
+    return None
+
+
+def cache_open_socket(target_ip: str, port: int, sock: socket.socket, banner: Optional[str],
+                      cache_size: int = SOCKET_CACHE_SIZE):
+    """
+    Keeps an open connection for reuse, evicting the least recently used
+    connections beyond cache_size.
+    
+    Args:
+        target_ip: The target IP address
+        port: The port number
+        sock: The connected socket object
+        banner: Banner read from the connection
+        cache_size: Maximum number of cached connections (default: 200)
+    """
+    evicted = []
+    with _OPEN_SOCK_CACHE_LOCK:
+        previous = _OPEN_SOCK_CACHE.pop((target_ip, port), None)
+        if previous is not None:
+            evicted.append(previous[0])
+        _OPEN_SOCK_CACHE[(target_ip, port)] = (sock, banner)
+        while len(_OPEN_SOCK_CACHE) > max(0, cache_size):
+            evicted.append(_OPEN_SOCK_CACHE.popitem(last=False)[1][0])
+    for old_sock in evicted:
+        old_sock.close()
+
+
+def trim_socket_cache(cache_size: int):
+    """
+    Closes the least recently used cached connections beyond cache_size.
+    
+    Args:
+        cache_size: Maximum number of cached connections to keep
+    """
+    evicted = []
+    with _OPEN_SOCK_CACHE_LOCK:
+        while len(_OPEN_SOCK_CACHE) > max(0, cache_size):
+            evicted.append(_OPEN_SOCK_CACHE.popitem(last=False)[1][0])
+    for old_sock in evicted:
+        old_sock.close()
+
+
+def close_cached_sockets():
+    """
+    Closes every cached open connection.
+    """
+    with _OPEN_SOCK_CACHE_LOCK:
+        entries = list(_OPEN_SOCK_CACHE.values())
+        _OPEN_SOCK_CACHE.clear()
+    for sock, _ in entries:
+        sock.close()
+
+
+atexit.register(close_cached_sockets)
+
+
+def banner_result(port: int, banner: Optional[str]) -> Tuple[int, bool, Optional[str], Optional[str]]:
+    """
+    Builds the scan result of an open port from its banner.
+    
+    Args:
+        port: The open port number
+        banner: Banner read from the port, or None
+    
+    Returns:
+        Tuple containing (port, is_open, service_name, banner)
+    """
+    return (port, True, identify_service(banner) or _SERVICES.get(port), banner)
+
+
+def _cached_or_none(target_ip: str, port: int) -> Optional[Tuple[int, bool, Optional[str], Optional[str]]]:
+    """
+    Returns the scan result of a port from its live cached connection.
+    Shared first step of grab_banner and grab_banner_async.
+    
+    Args:
+        target_ip: The target IP address
+        port: The port number
+    
+    Returns:
+        Tuple containing (port, is_open, service_name, banner), or None if nothing is cached
+    """
+    cached = get_cached_socket(target_ip, port)
+    return banner_result(port, cached[1]) if cached is not None else None
+
+
+@contextmanager
+def closed_on_error(sock: socket.socket):
+    """
+    Closes the socket if the block raises, e.g. when a scan is cancelled,
+    and leaves it open otherwise.
+    
+    Args:
+        sock: The socket object to guard
+    """
+    try:
+        yield sock
+    except BaseException:
+        sock.close()
+        raise
+
+
+def wait_for_socket(sock: socket.socket, timeout: float, writable: bool = False) -> bool:
+    """
+    Waits until a non-blocking socket becomes readable or writable.
+    Uses poll() where available since select() cannot watch descriptors
+    above FD_SETSIZE.
+    
+    Args:
+        sock: The non-blocking socket object
+        timeout: Maximum time to wait in seconds
+        writable: Wait for writability instead of readability (default: False)
+    
+    Returns:
+        True if the socket became ready before the timeout, False otherwise
+    """
+    if hasattr(select, 'poll'):
+        poller = select.poll()
+        poller.register(sock, select.POLLOUT if writable else select.POLLIN)
+        return bool(poller.poll(timeout * 1000))
+    if writable:
+        # Windows reports a failed non-blocking connect via the except set
+        _, ready, failed = select.select([], [sock], [sock], timeout)
+        return bool(ready or failed)
+    ready, _, _ = select.select([sock], [], [], timeout)
+    return bool(ready)
+
+
+def decode_banner(data: bytes) -> Optional[str]:
+    """
+    Decodes the first line of raw banner data for display.
+    
+    Args:
+        data: Raw bytes received from the service
+    
+    Returns:
+        Banner string if available, None otherwise
+    """
+    # Only the first line is displayed, so only the first line is decoded
+    line = data.lstrip().split(b'\n', 1)[0].strip()
+    return line.decode('utf-8', errors='ignore') if line else None
+
 
 def get_banner(sock: socket.socket, timeout: float = 2.0) -> Optional[str]:
     """
     Attempts to retrieve banner information from an open socket connection.
     
     Args:
-        sock: The connected socket object
+        sock: The connected non-blocking socket object
+        timeout: Timeout for receiving banner data (default: 2.0 seconds)
+    
+    Returns:
+        Banner string if available, None otherwise
+    """
+    try:
+        # Wait for banner data without blocking in recv()
+        if not wait_for_socket(sock, timeout):
+            return None
+        return decode_banner(sock.recv(BANNER_SIZE))
+    except (socket.error, ValueError):
+        return None
+
+
+async def get_banner_async(sock: socket.socket, timeout: float = 2.0) -> Optional[str]:
+    """
+    Asynchronously retrieves banner information from an open non-blocking socket.
+    
+    Args:
+        sock: The connected non-blocking socket object
         timeout: Timeout for receiving banner data (default: 2.0 seconds)
     
     Returns:
         Banner string if available, None otherwise
     """
+    loop = asyncio.get_running_loop()
     try:
-        sock.settimeout(timeout)
-        # Try to receive banner data
-        banner = sock.recv(1024).decode('utf-8', errors='ignore').strip()
-        return banner if banner else None
-    except (socket.timeout, socket.error, UnicodeDecodeError):
+        data = await asyncio.wait_for(loop.sock_recv(sock, BANNER_SIZE), timeout)
+        return decode_banner(data)
+    except (asyncio.TimeoutError, OSError):
         return None
 
 
-def scan_port(target_ip: str, port: int, timeout: float = 1.0) -> Tuple[int, bool, Optional[str], Optional[str]]:
+async def connect_async(sock: socket.socket, target_ip: str, port: int, timeout: float) -> bool:
     """
-    Scans a single port on the target IP address.
+    Asynchronously connects a non-blocking socket to the target port.
+    
+    Args:
+        sock: The non-blocking socket object
+        target_ip: The target IP address
+        port: The port number to connect to
+        timeout: Connection timeout in seconds
+    
+    Returns:
+        True if the connection was established, False otherwise
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        await asyncio.wait_for(loop.sock_connect(sock, (target_ip, port)), timeout)
+        return True
+    except (asyncio.TimeoutError, OSError):
+        # Port is closed or filtered
+        return False
+    except OverflowError:
+        # Port number outside 0-65535
+        return False
+
+
+async def scan_port_async(target_ip: str, port: int, timeout: float = 1.0) -> Tuple[int, bool]:
+    """
+    Asynchronously checks whether a single port on the target IP address is open.
+    The connection is closed as soon as the handshake result is known, and
+    a live cached connection to the port is used instead when there is one.
     
     Args:
         target_ip: The target IP address to scan
         port: The port number to scan
         timeout: Connection timeout in seconds (default: 1.0)
     
+    Returns:
+        Tuple containing (port, is_open)
+    """
+    # A live cached connection proves the port is open without a new handshake
+    if get_cached_socket(target_ip, port) is not None:
+        return (port, True)
+    
+    sock = await create_scan_socket_async(timeout)
+    try:
+        return (port, await connect_async(sock, target_ip, port, timeout))
+    finally:
+        sock.close()
+
+
+async def grab_banner_async(target_ip: str, port: int, timeout: float = 1.0,
+                            cache_size: int = SOCKET_CACHE_SIZE) -> Tuple[int, bool, Optional[str], Optional[str]]:
+    """
+    Asynchronously retrieves the banner of an open port.
+    Reuses a live cached connection when there is one; otherwise it
+    reconnects and keeps the new connection cached for later scans.
+    
+    Args:
+        target_ip: The target IP address
+        port: The open port number
+        timeout: Connection timeout in seconds (default: 1.0)
+        cache_size: Maximum number of cached connections (default: 200)
+    
     Returns:
         Tuple containing (port, is_open, service_name, banner)
     """
+    cached = _cached_or_none(target_ip, port)
+    if cached is not None:
+        return cached
+    
+    sock = await create_scan_socket_async(timeout)
+    with closed_on_error(sock):
+        if not await connect_async(sock, target_ip, port, timeout):
+            sock.close()
+            return banner_result(port, None)
+        banner = await get_banner_async(sock)
+    cache_open_socket(target_ip, port, sock, banner, cache_size)
+    return banner_result(port, banner)
+
+
+def connect_socket(sock: socket.socket, target_ip: str, port: int, timeout: float) -> bool:
+    """
+    Connects a non-blocking socket to the target port.
+    The timeout is a hard upper bound even for filtered hosts.
+    
+    Args:
+        sock: The non-blocking socket object
+        target_ip: The target IP address
+        port: The port number to connect to
+        timeout: Connection timeout in seconds
+    
+    Returns:
+        True if the connection was established, False otherwise
+    """
     try:
-        # Create a socket object
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
-        
-        # Attempt to connect to the port
+        # Start the connection; EINPROGRESS means the handshake is underway
         result = sock.connect_ex((target_ip, port))
+        if result in (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY):
+            if not wait_for_socket(sock, timeout, writable=True):
+                # Port is filtered
+                return False
+            result = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
         
-        if result == 0:
-            # Port is open
-            banner = get_banner(sock)
-            service_name = get_service_name(port)
+        # Anything but success means the port is closed or filtered
+        return result == 0
+    except (socket.error, ValueError, OverflowError):
+        # Socket error, hostname resolution error or port outside 0-65535
+        return False
+
+
+def scan_port(target_ip: str, port: int, timeout: float = 1.0) -> Tuple[int, bool]:
+    """
+    Checks whether a single port on the target IP address is open.
+    The connection is closed as soon as the handshake result is known, and
+    a live cached connection to the port is used instead when there is one.
+    
+    Args:
+        target_ip: The target IP address to scan
+        port: The port number to scan
+        timeout: Connection timeout in seconds (default: 1.0)
+    
+    Returns:
+        Tuple containing (port, is_open)
+    """
+    # A live cached connection proves the port is open without a new handshake
+    if get_cached_socket(target_ip, port) is not None:
+        return (port, True)
+    
+    # Failing to create a socket says nothing about the port, so it is raised
+    sock = create_scan_socket(timeout)
+    try:
+        return (port, connect_socket(sock, target_ip, port, timeout))
+    finally:
+        sock.close()
+
+
+def grab_banner(target_ip: str, port: int, timeout: float = 1.0,
+                cache_size: int = SOCKET_CACHE_SIZE) -> Tuple[int, bool, Optional[str], Optional[str]]:
+    """
+    Retrieves the banner of an open port.
+    Reuses a live cached connection when there is one; otherwise it
+    reconnects and keeps the new connection cached for later scans.
+    
+    Args:
+        target_ip: The target IP address
+        port: The open port number
+        timeout: Connection timeout in seconds (default: 1.0)
+        cache_size: Maximum number of cached connections (default: 200)
+    
+    Returns:
+        Tuple containing (port, is_open, service_name, banner)
+    """
+    cached = _cached_or_none(target_ip, port)
+    if cached is not None:
+        return cached
+    
+    sock = create_scan_socket(timeout)
+    with closed_on_error(sock):
+        if not connect_socket(sock, target_ip, port, timeout):
             sock.close()
-            return (port, True, service_name, banner)
+            return banner_result(port, None)
+        banner = get_banner(sock)
+    cache_open_socket(target_ip, port, sock, banner, cache_size)
+    return banner_result(port, banner)
+
+
+async def scan_ports_async(target_ip: str, ports: list, max_concurrency: int, timeout: float = 1.0,
+                           cache_size: int = SOCKET_CACHE_SIZE) -> list:
+    """
+    Scans all given ports concurrently on a single event loop.
+    Runs a connect-only pass over every port first, then grabs banners
+    from just the open ports so slow banners never hold up connects.
+    
+    Args:
+        target_ip: The target IP address to scan
+        ports: List of port numbers to scan
+        max_concurrency: Maximum number of connections in flight at once
+        timeout: Connection timeout in seconds (default: 1.0)
+        cache_size: Maximum number of open connections kept for reuse (default: 200)
+    
+    Returns:
+        List of scan results (port, is_open, service, banner) in the order of
+        ports; a port listed more than once is scanned once and its result
+        repeated at each position
+    """
+    # Each distinct port is scanned once, keeping first-seen order
+    unique_ports = list(dict.fromkeys(ports))
+    
+    # Cached connections hold descriptors for the whole scan, so together
+    # with the connections in flight they must fit the descriptor budget;
+    # the cache never takes more than a quarter of it
+    wanted = max(1, min(max_concurrency, len(unique_ports)))
+    limit = wanted
+    budget = descriptor_budget()
+    if budget is not None:
+        cache_size = min(cache_size, budget // 4)
+        limit = max(1, min(wanted, budget - cache_size))
+    trim_socket_cache(cache_size)
+    
+    semaphore = asyncio.Semaphore(limit)
+    loop = asyncio.get_running_loop()
+    
+    async def bounded_scan(port: int) -> Tuple[int, bool]:
+        async with semaphore:
+            return await scan_port_async(target_ip, port, timeout)
+    
+    async def bounded_grab(port: int) -> Tuple[int, bool, Optional[str], Optional[str]]:
+        async with semaphore:
+            return await grab_banner_async(target_ip, port, timeout, cache_size)
+    
+    # Progress output is handed to a printer thread so the event loop never
+    # blocks on terminal writes
+    progress: queue.SimpleQueue = queue.SimpleQueue()
+    printer = threading.Thread(target=print_progress, args=(progress,), daemon=True)
+    printer.start()
+    if limit < wanted:
+        progress.put(f"File descriptor limit allows only {limit} concurrent connections\n")
+    try:
+        # Phase 1: connect-only pass over every port, in the native core when
+        # it is available
+        if _SCAN_CORE is not None:
+            blocks = _native_connect_blocks(loop, target_ip, unique_ports, limit, timeout, bounded_scan)
         else:
-            # Port is closed or filtered
-            sock.close()
-            return (port, False, None, None)
+            blocks = _task_connect_blocks(loop, unique_ports, bounded_scan)
+        
+        # Results are stored at each port's position, so they come back in
+        # port order without growing or sorting a list
+        port_to_idx = {port: idx for idx, port in enumerate(unique_ports)}
+        results = [None] * len(unique_ports)
+        open_ports = []
+        completed = 0
+        try:
+            async for block in blocks:
+                lines = []
+                for port, is_open in block:
+                    if is_open:
+                        open_ports.append(port)
+                        # Show open ports found in this block
+                        lines.append(f"[+] Port {port} is OPEN - {_SERVICES.get(port) or 'Unknown Service'}")
+                    else:
+                        results[port_to_idx[port]] = (port, False, None, None)
+                
+                previous = completed
+                completed += len(block)
+                
+                # Progress indicator
+                if completed // PROGRESS_INTERVAL != previous // PROGRESS_INTERVAL or completed == len(unique_ports):
+                    lines.append(f"Progress: {completed}/{len(unique_ports)} ports scanned...")
+                if lines:
+                    progress.put('\n'.join(lines) + '\r')
+        finally:
+            # Stops any probes still running if the pass ends early
+            await blocks.aclose()
+        
+        # Phase 2: banner grabbing for the (usually few) open ports
+        if open_ports:
+            progress.put(f"\nGrabbing banners from {len(open_ports)} open port(s)...\r")
+            grabs = [loop.create_task(bounded_grab(port)) for port in open_ports]
+            try:
+                for result in await asyncio.gather(*grabs):
+                    results[port_to_idx[result[0]]] = result
+            finally:
+                await cancel_tasks(grabs)
+        
+        if len(unique_ports) == len(ports):
+            return results
+        return [results[port_to_idx[port]] for port in ports]
+    finally:
+        progress.put(None)
+        printer.join()
+
+
+async def cancel_tasks(tasks: list):
+    """
+    Cancels the given tasks and waits for them to finish, so none outlive
+    the scan on the shared event loop.
+    
+    Args:
+        tasks: List of tasks, finished or not
+    """
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _task_connect_blocks(loop: asyncio.AbstractEventLoop, ports: list, bounded_scan):
+    """
+    Checks every port with one task each and yields the results in blocks.
+    Tasks still running when the generator is closed, or when a check
+    raises, are cancelled.
+    
+    Args:
+        loop: The running event loop
+        ports: List of port numbers to scan
+        bounded_scan: Coroutine function checking one port under the concurrency limit
+    
+    Yields:
+        Lists of up to COMPLETION_BATCH_SIZE (port, is_open) tuples
+    """
+    # Finished tasks are queued by a done callback so each completion costs
+    # O(1), unlike re-waiting on the whole pending set
+    done_queue: asyncio.Queue = asyncio.Queue()
+    tasks = [loop.create_task(bounded_scan(port)) for port in ports]
+    for task in tasks:
+        task.add_done_callback(done_queue.put_nowait)
+    
+    try:
+        completed = 0
+        while completed < len(ports):
+            # Pull completions in blocks so reporting happens once per block
+            batch = [await done_queue.get()]
+            while len(batch) < COMPLETION_BATCH_SIZE and not done_queue.empty():
+                batch.append(done_queue.get_nowait())
+            completed += len(batch)
+            yield [task.result() for task in batch]
+    finally:
+        await cancel_tasks(tasks)
+
+
+async def _native_connect_blocks(loop: asyncio.AbstractEventLoop, target_ip: str, ports: list,
+                                 max_concurrency: int, timeout: float, bounded_scan):
+    """
+    Checks every port with the native scan core and yields the results one
+    chunk of ports at a time. Ports with a live cached connection are reported
+    without a new handshake, ports outside 1-65535 are reported closed like
+    the other backends do, and ports the core could not check are retried
+    one task each.
+    
+    Args:
+        loop: The running event loop
+        target_ip: The target IP address to scan
+        ports: List of port numbers to scan
+        max_concurrency: Maximum number of connections in flight at once
+        timeout: Connection timeout in seconds
+        bounded_scan: Coroutine function checking one port under the concurrency limit
+    
+    Yields:
+        Lists of (port, is_open) tuples
+    """
+    cached = {port for port in ports if get_cached_socket(target_ip, port) is not None} if _OPEN_SOCK_CACHE else set()
+    if cached:
+        yield [(port, True) for port in ports if port in cached]
+    
+    invalid = [port for port in ports if not MIN_PORT <= port <= MAX_PORT]
+    if invalid:
+        # The core rejects these; they cannot be encoded in a TCP header
+        yield [(port, False) for port in invalid]
+    
+    remaining = [port for port in ports if port not in cached and MIN_PORT <= port <= MAX_PORT]
+    chunk_size = max(NATIVE_CHUNK_PORTS, max_concurrency * 4)
+    unscanned = []
+    for start in range(0, len(remaining), chunk_size):
+        # The core releases the GIL, so run it off the event loop thread
+        block = await loop.run_in_executor(
+            None, scan_ports_native, target_ip, remaining[start:start + chunk_size], max_concurrency, timeout
+        )
+        yield [result for result in block if result[1] is not None]
+        unscanned.extend(port for port, is_open in block if is_open is None)
+    
+    if unscanned:
+        retries = _task_connect_blocks(loop, unscanned, bounded_scan)
+        try:
+            async for retried in retries:
+                yield retried
+        finally:
+            await retries.aclose()
+
+
+def load_scan_core() -> Optional[ctypes.CDLL]:
+    """
+    Loads the compiled connect-phase core if it has been built.
+    
+    Returns:
+        The loaded library, or None if it is unavailable
+    """
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        core = ctypes.CDLL(SCAN_CORE_PATH, use_errno=True)
+    except OSError:
+        return None
+    core.scan_ports.argtypes = [
+        ctypes.c_char_p, ctypes.POINTER(ctypes.c_int), ctypes.c_int,
+        ctypes.c_int, ctypes.c_int, ctypes.POINTER(ctypes.c_ubyte),
+    ]
+    core.scan_ports.restype = ctypes.c_int
+    return core
+
+
+_SCAN_CORE = load_scan_core()
+
+
+def scan_ports_native(target_ip: str, ports: list, max_concurrency: int, timeout: float = 1.0) -> list:
+    """
+    Checks which ports are open using the compiled epoll core.
+    The whole connect pass runs in C and returns once every port is classified.
+    
+    Args:
+        target_ip: The target IP address to scan
+        ports: List of port numbers to scan
+        max_concurrency: Maximum number of connections in flight at once
+        timeout: Connection timeout in seconds (default: 1.0)
+    
+    Returns:
+        List of (port, is_open) tuples in the order of ports; is_open is None
+        for ports the core could not create a socket for
+    
+    Raises:
+        OSError: If the core fails, e.g. EINVAL for a port outside 1-65535
+    """
+    port_array = (ctypes.c_int * len(ports))(*ports)
+    port_states = (ctypes.c_ubyte * len(ports))()
+    status = _SCAN_CORE.scan_ports(
+        target_ip.encode('ascii'), port_array, len(ports),
+        max(1, int(timeout * 1000)), max_concurrency, port_states,
+    )
+    if status != 0:
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err))
+    return [
+        (port, None if state == CORE_PORT_UNSCANNED else state == CORE_PORT_OPEN)
+        for port, state in zip(ports, port_states)
+    ]
+
+
+def print_progress(progress: queue.SimpleQueue):
+    """
+    Writes progress text to stderr until a None sentinel is received.
+    Intended to run on its own thread so scanning never waits on the terminal.
+    
+    Args:
+        progress: Queue of progress text to write
+    """
+    while True:
+        text = progress.get()
+        if text is None:
+            return
+        sys.stderr.write(text)
+        sys.stderr.flush()
+
+
+def syn_scan_unavailable_reason() -> Optional[str]:
+    """
+    Checks whether SYN scanning can be used in this environment.
+    
+    Returns:
+        Reason SYN scanning is unavailable, or None if it can be used
+    """
+    if not sys.platform.startswith('linux'):
+        return "SYN scan requires Linux raw sockets"
+    if os.geteuid() != 0:
+        return "SYN scan requires root privileges"
+    return None
+
+
+def get_source_ip(target_ip: str) -> str:
+    """
+    Returns the local address the kernel would use to reach the target.
+    
+    Args:
+        target_ip: The target IP address
+    
+    Returns:
+        Local IP address as a dotted-quad string
+    """
+    # Connecting a UDP socket only selects a route; no packet is sent
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+        probe.connect((target_ip, 9))
+        return probe.getsockname()[0]
+
+
+def tcp_checksum(data: bytes) -> int:
+    """
+    Computes the ones' complement internet checksum of the given data.
+    
+    Args:
+        data: Pseudo-header followed by the TCP header
+    
+    Returns:
+        16-bit checksum
+    """
+    if len(data) % 2:
+        data += b'\0'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    while total >> 16:
+        total = (total & 0xFFFF) + (total >> 16)
+    return ~total & 0xFFFF
+
+
+def build_syn_packet(src_addr: bytes, dst_addr: bytes, src_port: int, dst_port: int, seq: int) -> bytes:
+    """
+    Builds a TCP SYN header; the kernel prepends the IP header on send.
+    
+    Args:
+        src_addr: Packed local IPv4 address
+        dst_addr: Packed target IPv4 address
+        src_port: Local source port
+        dst_port: Target port to probe
+        seq: Initial sequence number carrying the probe cookie
+    
+    Returns:
+        TCP header bytes with a valid checksum
+    """
+    header = struct.pack('!HHIIBBHHH', src_port, dst_port, seq, 0, 5 << 4, TCP_SYN, 1024, 0, 0)
+    pseudo_header = struct.pack('!4s4sBBH', src_addr, dst_addr, 0, socket.IPPROTO_TCP, len(header))
+    checksum = tcp_checksum(pseudo_header + header)
+    return header[:16] + struct.pack('!H', checksum) + header[18:]
+
+
+def syn_cookie(port: int, secret: int) -> int:
+    """
+    Derives the sequence number of a SYN probe from its port.
+    
+    Args:
+        port: Target port of the probe
+        secret: Per-scan random secret
+    
+    Returns:
+        32-bit initial sequence number
+    """
+    return zlib.crc32(port.to_bytes(2, 'big')) ^ secret
+
+
+def classify_syn_reply(packet: bytes, dst_addr: bytes, src_port: int, secret: int) -> Optional[Tuple[int, bool]]:
+    """
+    Classifies a TCP segment received on the raw socket during a SYN scan.
+    
+    Args:
+        packet: Received packet, IP header included
+        dst_addr: Packed target IPv4 address
+        src_port: Local source port the probes were sent from
+        secret: Per-scan secret the probe cookies were derived with
+    
+    Returns:
+        Tuple containing (port, is_open) for a reply to one of the probes,
+        None for unrelated or malformed packets
+    """
+    if len(packet) < 20:
+        return None
+    ihl = (packet[0] & 0x0F) * 4
+    if packet[12:16] != dst_addr or len(packet) < ihl + 14:
+        return None
+    port, dport, _, ack, _, flags = struct.unpack_from('!HHIIBB', packet, ihl)
+    if dport != src_port or ack != (syn_cookie(port, secret) + 1) & 0xFFFFFFFF:
+        return None
+    # SYN/ACK means open and RST means closed; no reply at all means filtered
+    if flags & SYN_ACK == SYN_ACK:
+        return (port, True)
+    if flags & TCP_RST:
+        return (port, False)
+    return None
+
+
+def syn_scan(target_ip: str, ports: list, settle_time: float = SYN_SETTLE_TIME) -> list:
+    """
+    Performs a stateless half-open SYN scan of all given ports.
+    The calling thread sends every SYN as fast as the socket accepts them
+    while a receiver thread classifies replies. Each probe's sequence
+    number is a cookie derived from its port, so replies are matched
+    without keeping per-port state. The kernel answers every SYN/ACK with
+    a RST since no local socket owns the source port.
+    
+    Args:
+        target_ip: The target IP address to scan
+        ports: List of port numbers to scan
+        settle_time: Time to keep listening after the last probe in seconds (default: 2.0)
+    
+    Returns:
+        List of scan results (port, is_open, service, banner)
+    """
+    src_addr = socket.inet_aton(get_source_ip(target_ip))
+    dst_addr = socket.inet_aton(target_ip)
+    src_port = random.randint(40000, 60999)
+    secret = random.getrandbits(32)
+    
+    # Receives a copy of every inbound TCP segment, IP header included
+    raw_sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP)
+    raw_sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    raw_sock.settimeout(0.1)
+    
+    open_ports = set()
+    wanted = {port for port in ports if MIN_PORT <= port <= MAX_PORT}
+    stop = threading.Event()
+    
+    def receive_replies():
+        while not stop.is_set():
+            try:
+                packet = raw_sock.recv(65535)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
             
-    except socket.gaierror:
-        # Hostname resolution error
-        return (port, False, None, None)
-    except socket.error:
-        # Socket error
-        return (port, False, None, None)
-    except Exception as e:
-        # Other unexpected errors
-        return (port, False, None, None)
+            reply = classify_syn_reply(packet, dst_addr, src_port, secret)
+            if reply is not None and reply[1] and reply[0] in wanted:
+                open_ports.add(reply[0])
+    
+    receiver = threading.Thread(target=receive_replies, daemon=True)
+    receiver.start()
+    try:
+        for port in ports:
+            if not MIN_PORT <= port <= MAX_PORT:
+                # Cannot be encoded in a TCP header; reported closed
+                continue
+            packet = build_syn_packet(src_addr, dst_addr, src_port, port, syn_cookie(port, secret))
+            while True:
+                try:
+                    raw_sock.sendto(packet, (target_ip, 0))
+                    break
+                except OSError as e:
+                    # Back off briefly when the transmit queue is full
+                    if e.errno != errno.ENOBUFS:
+                        raise
+                    time.sleep(0.001)
+        
+        time.sleep(settle_time)
+    finally:
+        stop.set()
+        receiver.join()
+        raw_sock.close()
+    
+    return [
+        (port, True, _SERVICES.get(port), None) if port in open_ports else (port, False, None, None)
+        for port in ports
+    ]
+
+
+def get_scan_loop() -> asyncio.AbstractEventLoop:
+    """
+    Returns the event loop shared by all scans, creating it on first use.
+    Reusing one loop avoids rebuilding the selector and default executor
+    for every scan performed by the process.
+    
+    Returns:
+        The shared event loop
+    """
+    global _SCAN_LOOP
+    if _SCAN_LOOP is None or _SCAN_LOOP.is_closed():
+        _SCAN_LOOP = asyncio.new_event_loop()
+        atexit.register(_SCAN_LOOP.close)
+    return _SCAN_LOOP
+
+
+def scan_ports(target_ip: str, ports: list, max_concurrency: int, timeout: float = 1.0,
+               cache_size: int = SOCKET_CACHE_SIZE) -> list:
+    """
+    Scans all given ports on the shared event loop and waits for the results.
+    
+    Args:
+        target_ip: The target IP address to scan
+        ports: List of port numbers to scan
+        max_concurrency: Maximum number of connections in flight at once
+        timeout: Connection timeout in seconds (default: 1.0)
+        cache_size: Maximum number of open connections kept for reuse (default: 200)
+    
+    Returns:
+        List of scan results (port, is_open, service, banner) in the order of
+        ports, with repeated ports scanned once and their result repeated
+    """
+    loop = get_scan_loop()
+    scan = loop.create_task(scan_ports_async(target_ip, ports, max_concurrency, timeout, cache_size))
+    try:
+        return loop.run_until_complete(scan)
+    finally:
+        # On KeyboardInterrupt the scan is still running; unwind it so its
+        # tasks do not resume during the next scan on this loop
+        if not scan.done():
+            scan.cancel()
+            loop.run_until_complete(asyncio.gather(scan, return_exceptions=True))
+
+
+def install_event_loop_policy() -> bool:
+    """
+    Installs the fastest available event loop policy for the scan loop.
+    Uses uvloop (libuv) when it is installed on a POSIX platform and falls
+    back to the default asyncio event loop otherwise.
+    
+    Returns:
+        True if an accelerated event loop policy was installed, False otherwise
+    """
+    if uvloop is None or sys.platform == 'win32':
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+def descriptor_budget() -> Optional[int]:
+    """
+    Returns how many descriptors a scan may use for its sockets.
+    
+    Returns:
+        The process file descriptor limit minus headroom, or None if unlimited or unknown
+    """
+    if resource is None:
+        return None
+    soft_limit, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft_limit == resource.RLIM_INFINITY:
+        return None
+    return max(2, soft_limit - DESCRIPTOR_HEADROOM)
 
 
 def get_service_name(port: int) -> Optional[str]:
@@ -82,30 +1120,30 @@ def get_service_name(port: int) -> Optional[str]:
     Returns:
         Service name if known, None otherwise
     """
-    common_services = {
-        20: "FTP Data",
-        21: "FTP",
-        22: "SSH",
-        23: "Telnet",
-        25: "SMTP",
-        53: "DNS",
-        80: "HTTP",
-        110: "POP3",
-        143: "IMAP",
-        443: "HTTPS",
-        445: "SMB",
-        3306: "MySQL",
-        3389: "RDP",
-        5432: "PostgreSQL",
-        8080: "HTTP-Proxy",
-    }
-    return common_services.get(port, None)
+    return _SERVICES.get(port)
+
+
+def identify_service(banner: Optional[str]) -> Optional[str]:
+    """
+    Identifies the service from its banner, regardless of the port it runs on.
+    
+    Args:
+        banner: Banner string, or None if no banner was received
+    
+    Returns:
+        Service name if the banner matches a known signature, None otherwise
+    """
+    if not banner:
+        return None
+    match = _BANNER_SIGNATURES.match(banner)
+    return match.lastgroup if match else None
 
 
 def parse_port_range(port_input: str) -> list:
     """
     Parses port range input from user.
     Supports single port, range (e.g., 1-100), or comma-separated ports.
+    Ports outside 1-65535 are rejected.
     
     Args:
         port_input: User input string for ports
@@ -113,7 +1151,8 @@ def parse_port_range(port_input: str) -> list:
     Returns:
         List of port numbers to scan
     """
-    ports = []
+    # Collect (start, end) intervals instead of enumerating every port
+    intervals = []
     
     # Split by comma for multiple ranges/ports
     parts = port_input.split(',')
@@ -129,20 +1168,51 @@ def parse_port_range(port_input: str) -> list:
                 end = int(end.strip())
                 if start > end:
                     start, end = end, start
-                ports.extend(range(start, end + 1))
             except ValueError:
                 print(f"Invalid range format: {part}")
                 continue
+            if start < MIN_PORT or end > MAX_PORT:
+                print(f"Invalid port number: {part}")
+                continue
+            intervals.append((start, end))
         else:
             # Single port
             try:
-                ports.append(int(part))
+                port = int(part)
             except ValueError:
                 print(f"Invalid port number: {part}")
                 continue
+            if not MIN_PORT <= port <= MAX_PORT:
+                print(f"Invalid port number: {part}")
+                continue
+            intervals.append((port, port))
     
-    # Remove duplicates and sort
-    return sorted(list(set(ports)))
+    # Merge overlapping/adjacent intervals so each port is produced once, in
+    # order; list.extend(range) enumerates each interval in C
+    ports = []
+    for start, end in merge_intervals(intervals):
+        ports.extend(range(start, end + 1))
+    return ports
+
+
+def merge_intervals(intervals: list) -> list:
+    """
+    Merges overlapping or adjacent inclusive (start, end) intervals.
+    
+    Args:
+        intervals: List of (start, end) tuples with start <= end
+    
+    Returns:
+        Sorted list of disjoint (start, end) tuples
+    """
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
 
 
 def display_results(results: list, target_ip: str, scan_time: float):
@@ -157,32 +1227,44 @@ def display_results(results: list, target_ip: str, scan_time: float):
     # Filter only open ports
     open_ports = [r for r in results if r[1]]
     
-    print("\n" + "="*80)
-    print(f"PORT SCAN RESULTS FOR {target_ip}")
-    print("="*80)
+    # Build the whole report first so it is written with a single call
+    lines = ["\n" + "="*80, f"PORT SCAN RESULTS FOR {target_ip}", "="*80]
     
     if not open_ports:
-        print("\nNo open ports found.")
+        lines.append("\nNo open ports found.")
     else:
-        print(f"\nFound {len(open_ports)} open port(s):\n")
-        print(f"{'Port':<10} {'Status':<10} {'Service':<20} {'Banner':<40}")
-        print("-" * 80)
+        lines.append(f"\nFound {len(open_ports)} open port(s):\n")
+        lines.append(f"{'Port':<10} {'Status':<10} {'Service':<20} {'Banner':<40}")
+        lines.append("-" * 80)
         
-        for port, is_open, service, banner in open_ports:
-            port_str = str(port)
-            status = "OPEN"
-            service_str = service if service else "Unknown"
-            banner_str = banner if banner else "No banner"
-            
-            # Truncate banner if too long
-            if len(banner_str) > 38:
-                banner_str = banner_str[:35] + "..."
-            
-            print(f"{port_str:<10} {status:<10} {service_str:<20} {banner_str:<40}")
+        status = "OPEN".ljust(10)
+        lines.extend(
+            f"{str(port).ljust(10)} {status} {(service or 'Unknown').ljust(20)} {truncate_banner(banner).ljust(40)}"
+            for port, _, service, banner in open_ports
+        )
     
-    print("\n" + "="*80)
-    print(f"Scan completed in {scan_time:.2f} seconds")
-    print("="*80 + "\n")
+    lines.append("\n" + "="*80)
+    lines.append(f"Scan completed in {scan_time:.2f} seconds")
+    lines.append("="*80 + "\n")
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+def truncate_banner(banner: Optional[str], width: int = 38) -> str:
+    """
+    Shortens a banner to fit the results table.
+    
+    Args:
+        banner: Banner string, or None if no banner was received
+        width: Maximum displayed width (default: 38)
+    
+    Returns:
+        Banner text no longer than width characters
+    """
+    if not banner:
+        return "No banner"
+    if len(banner) > width:
+        return banner[:width - 3] + "..."
+    return banner
 
 
 def main():
@@ -190,16 +1272,16 @@ def main():
     Main function to run the port scanner.
     """
     print("\n" + "="*80)
-    print("PORT SCANNER - Multi-threaded Port Scanner with Banner Grabbing")
+    print("PORT SCANNER - Asynchronous Port Scanner with Banner Grabbing")
     print("="*80 + "\n")
     
     # Get target IP address
     while True:
-        target_ip = input("Enter target IP address or hostname: ").strip()
-        if target_ip:
-            # Validate IP or hostname
+        target_host = input("Enter target IP address or hostname: ").strip()
+        if target_host:
+            # Validate and resolve once so every probe uses a numeric address
             try:
-                socket.gethostbyname(target_ip)
+                target_ip = socket.gethostbyname(target_host)
                 break
             except socket.gaierror:
                 print("Invalid IP address or hostname. Please try again.")
@@ -218,10 +1300,25 @@ def main():
         else:
             print("Port range cannot be empty. Please try again.")
     
-    # Get number of threads
+    # Get scan type
     while True:
+        scan_type = input("Enter scan type, connect or syn (default: connect): ").strip().lower()
+        if not scan_type:
+            scan_type = "connect"
+        if scan_type in ("connect", "syn"):
+            break
+        print("Invalid scan type. Please enter 'connect' or 'syn'.")
+    
+    if scan_type == "syn":
+        reason = syn_scan_unavailable_reason()
+        if reason:
+            print(f"{reason}. Falling back to connect scan.")
+            scan_type = "connect"
+    
+    # Get number of workers; a SYN scan sends from a single thread
+    while scan_type == "connect":
         try:
-            num_threads = input("Enter number of threads (default: 50): ").strip()
+            num_threads = input("Enter number of workers (default: 50): ").strip()
             if not num_threads:
                 num_threads = 50
             else:
@@ -229,16 +1326,22 @@ def main():
             if num_threads > 0:
                 break
             else:
-                print("Number of threads must be greater than 0.")
+                print("Number of workers must be greater than 0.")
         except ValueError:
             print("Invalid number. Please enter a valid integer.")
     
-    # Get timeout
+    # Get timeout; for a SYN scan it is how long to wait for replies
+    if scan_type == "syn":
+        timeout_prompt = f"Enter time to wait for replies in seconds (default: {SYN_SETTLE_TIME}): "
+        default_timeout = SYN_SETTLE_TIME
+    else:
+        timeout_prompt = "Enter connection timeout in seconds (default: 1.0): "
+        default_timeout = 1.0
     while True:
         try:
-            timeout_input = input("Enter connection timeout in seconds (default: 1.0): ").strip()
+            timeout_input = input(timeout_prompt).strip()
             if not timeout_input:
-                timeout = 1.0
+                timeout = default_timeout
             else:
                 timeout = float(timeout_input)
             if timeout > 0:
@@ -248,40 +1351,33 @@ def main():
         except ValueError:
             print("Invalid number. Please enter a valid float.")
     
-    print(f"\nScanning {len(ports)} port(s) on {target_ip}...")
-    print(f"Using {num_threads} threads with {timeout}s timeout per connection\n")
-    
-    start_time = time.time()
-    results = []
+    target_label = target_ip if target_host == target_ip else f"{target_host} ({target_ip})"
+    print(f"\nScanning {len(ports)} port(s) on {target_label}...")
     
-    # Use ThreadPoolExecutor for concurrent scanning
-    with ThreadPoolExecutor(max_workers=num_threads) as executor:
-        # Submit all port scan tasks
-        future_to_port = {
-            executor.submit(scan_port, target_ip, port, timeout): port 
-            for port in ports
-        }
+    if scan_type == "syn":
+        print(f"Sending SYN probes, then listening {timeout}s for replies\n")
+        start_time = time.time()
+        results = syn_scan(target_ip, ports, settle_time=timeout)
+    else:
+        max_concurrency = num_threads * CONNECTIONS_PER_WORKER
+        cache_size = num_threads * CACHED_SOCKETS_PER_WORKER
+        print(f"Using up to {max_concurrency} concurrent connections with {timeout}s timeout per connection\n")
         
-        # Process completed tasks
-        completed = 0
-        for future in as_completed(future_to_port):
-            completed += 1
-            result = future.result()
-            results.append(result)
-            
-            # Show progress
-            if result[1]:  # If port is open
-                print(f"[+] Port {result[0]} is OPEN - {result[2] or 'Unknown Service'}")
-            
-            # Progress indicator
-            if completed % 50 == 0 or completed == len(ports):
-                print(f"Progress: {completed}/{len(ports)} ports scanned...", end='\r')
+        if install_event_loop_policy():
+            print("Using uvloop event loop\n")
+        if _SCAN_CORE is not None:
+            print("Using native scan core for connection checks\n")
+        
+        start_time = time.time()
+        
+        # Multiplex all connection attempts on a single event loop
+        results = scan_ports(target_ip, ports, max_concurrency, timeout, cache_size)
     
     end_time = time.time()
     scan_time = end_time - start_time
     
     # Display results
-    display_results(results, target_ip, scan_time)
+    display_results(results, target_label, scan_time)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,486 @@
+"""
+Tests for port_scanner.py
+
+Run with:
+    python -m pytest -q
+"""
+
+import ctypes
+import errno
+import shutil
+import socket
+import struct
+import subprocess
+import sys
+import textwrap
+import threading
+
+import pytest
+
+import port_scanner
+
+
+BANNER = b"SSH-2.0-OpenSSH_9.6\r\n"
+
+
+@pytest.fixture(autouse=True)
+def empty_socket_cache():
+    """Keeps connections cached by one test from answering for the next."""
+    port_scanner.close_cached_sockets()
+    yield
+    port_scanner.close_cached_sockets()
+
+
+@pytest.fixture
+def banner_port():
+    """Loopback port that accepts connections and sends an SSH banner."""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(16)
+    connections = []
+
+    def serve():
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return
+            connections.append(conn)
+            try:
+                conn.sendall(BANNER)
+            except OSError:
+                # Connect-only probes reset the connection straight away
+                pass
+
+    threading.Thread(target=serve, daemon=True).start()
+    yield server.getsockname()[1]
+    server.close()
+    for conn in connections:
+        conn.close()
+
+
+@pytest.fixture
+def closed_port():
+    """Loopback port that is bound but not listening, so connects are refused."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(('127.0.0.1', 0))
+    yield sock.getsockname()[1]
+    sock.close()
+
+
+@pytest.fixture(scope='session')
+def scan_core_path(tmp_path_factory):
+    """Path of _scancore.so freshly built from _scancore.c."""
+    if not sys.platform.startswith('linux'):
+        pytest.skip("native scan core requires Linux")
+    compiler = shutil.which('cc') or shutil.which('gcc')
+    if compiler is None:
+        pytest.skip("no C compiler available")
+    source = port_scanner.SCAN_CORE_PATH[:-len('.so')] + '.c'
+    path = str(tmp_path_factory.mktemp('core') / '_scancore.so')
+    subprocess.run([compiler, '-O2', '-shared', '-fPIC', '-o', path, source], check=True)
+    return path
+
+
+@pytest.fixture
+def scan_core(scan_core_path, monkeypatch):
+    """Native scan core loaded through load_scan_core() and installed for scans."""
+    monkeypatch.setattr(port_scanner, 'SCAN_CORE_PATH', scan_core_path)
+    core = port_scanner.load_scan_core()
+    assert core is not None
+    monkeypatch.setattr(port_scanner, '_SCAN_CORE', core)
+    return core
+
+
+# parse_port_range / merge_intervals
+
+def test_merge_intervals_merges_overlapping_and_adjacent():
+    assert port_scanner.merge_intervals([(10, 20), (1, 5), (6, 8), (15, 30), (40, 40)]) == [
+        (1, 8), (10, 30), (40, 40)
+    ]
+
+
+def test_merge_intervals_keeps_contained_interval():
+    assert port_scanner.merge_intervals([(1, 100), (20, 30)]) == [(1, 100)]
+
+
+def test_merge_intervals_empty():
+    assert port_scanner.merge_intervals([]) == []
+
+
+def test_parse_port_range_deduplicates_and_sorts():
+    assert port_scanner.parse_port_range("25, 20-22, 21, 80") == [20, 21, 22, 25, 80]
+
+
+def test_parse_port_range_swaps_reversed_range():
+    assert port_scanner.parse_port_range("5-3") == [3, 4, 5]
+
+
+@pytest.mark.parametrize("port_input", ["0", "65536", "70000", "0-10", "65530-65536", "http"])
+def test_parse_port_range_rejects_invalid_ports(port_input, capsys):
+    assert port_scanner.parse_port_range(port_input) == []
+    assert "Invalid" in capsys.readouterr().out
+
+
+def test_parse_port_range_accepts_bounds():
+    assert port_scanner.parse_port_range("1,65535") == [1, 65535]
+
+
+# tcp_checksum / build_syn_packet
+
+def test_tcp_checksum_known_value():
+    # Worked example from RFC 1071, section 3
+    data = bytes([0x00, 0x01, 0xf2, 0x03, 0xf4, 0xf5, 0xf6, 0xf7])
+    assert port_scanner.tcp_checksum(data) == ~0xddf2 & 0xFFFF
+
+
+def test_tcp_checksum_pads_odd_length():
+    assert port_scanner.tcp_checksum(b'\x12') == port_scanner.tcp_checksum(b'\x12\x00')
+
+
+def test_build_syn_packet_fields_and_checksum():
+    src_addr = socket.inet_aton('10.0.0.1')
+    dst_addr = socket.inet_aton('10.0.0.2')
+    packet = port_scanner.build_syn_packet(src_addr, dst_addr, 40000, 443, 0xDEADBEEF)
+
+    assert len(packet) == 20
+    src_port, dst_port, seq, ack, offset, flags, window, _, urgent = struct.unpack('!HHIIBBHHH', packet)
+    assert (src_port, dst_port, seq, ack) == (40000, 443, 0xDEADBEEF, 0)
+    assert offset >> 4 == 5
+    assert flags == port_scanner.TCP_SYN
+    assert (window, urgent) == (1024, 0)
+
+    # A correct checksum makes the sum over pseudo-header and segment zero
+    pseudo_header = struct.pack('!4s4sBBH', src_addr, dst_addr, 0, socket.IPPROTO_TCP, len(packet))
+    assert port_scanner.tcp_checksum(pseudo_header + packet) == 0
+
+
+
+def make_reply(src_addr, port, dport, ack, flags, ihl=5):
+    """Builds an IPv4 packet carrying a TCP reply from src_addr:port."""
+    ip_header = struct.pack('!BBHHHBBH4s4s', 0x40 | ihl, 0, 0, 0, 0, 64, socket.IPPROTO_TCP, 0,
+                            src_addr, socket.inet_aton('10.0.0.1'))
+    ip_header += b'\0' * (ihl * 4 - 20)
+    return ip_header + struct.pack('!HHIIBBHHH', port, dport, 1, ack, 5 << 4, flags, 1024, 0, 0)
+
+
+SECRET = 0x5EC12E7
+TARGET = socket.inet_aton('10.0.0.2')
+
+
+@pytest.mark.parametrize("flags, expected", [
+    (port_scanner.SYN_ACK, (443, True)),
+    (port_scanner.TCP_RST | 0x10, (443, False)),
+    (0x10, None),
+])
+def test_classify_syn_reply_flags(flags, expected):
+    ack = (port_scanner.syn_cookie(443, SECRET) + 1) & 0xFFFFFFFF
+    packet = make_reply(TARGET, 443, 40000, ack, flags)
+    assert port_scanner.classify_syn_reply(packet, TARGET, 40000, SECRET) == expected
+
+
+def test_classify_syn_reply_honours_ip_options():
+    ack = (port_scanner.syn_cookie(22, SECRET) + 1) & 0xFFFFFFFF
+    packet = make_reply(TARGET, 22, 40000, ack, port_scanner.SYN_ACK, ihl=6)
+    assert port_scanner.classify_syn_reply(packet, TARGET, 40000, SECRET) == (22, True)
+
+
+def test_classify_syn_reply_ignores_unrelated_packets():
+    ack = (port_scanner.syn_cookie(443, SECRET) + 1) & 0xFFFFFFFF
+    reply = make_reply(TARGET, 443, 40000, ack, port_scanner.SYN_ACK)
+    classify = port_scanner.classify_syn_reply
+    assert classify(make_reply(socket.inet_aton('10.0.0.9'), 443, 40000, ack, port_scanner.SYN_ACK),
+                    TARGET, 40000, SECRET) is None
+    assert classify(make_reply(TARGET, 443, 40001, ack, port_scanner.SYN_ACK), TARGET, 40000, SECRET) is None
+    assert classify(make_reply(TARGET, 443, 40000, ack + 1, port_scanner.SYN_ACK), TARGET, 40000, SECRET) is None
+    # A cookie for another port does not validate this one
+    assert classify(make_reply(TARGET, 444, 40000, ack, port_scanner.SYN_ACK), TARGET, 40000, SECRET) is None
+    assert classify(reply, TARGET, 40000, SECRET ^ 1) is None
+    assert classify(reply[:30], TARGET, 40000, SECRET) is None
+    assert classify(b'', TARGET, 40000, SECRET) is None
+
+
+def test_classify_syn_reply_wraps_acknowledgement():
+    # Pick the secret so port 80's cookie is the largest sequence number and the ack wraps to 0
+    secret = port_scanner.zlib.crc32((80).to_bytes(2, 'big')) ^ 0xFFFFFFFF
+    assert port_scanner.syn_cookie(80, secret) == 0xFFFFFFFF
+    packet = make_reply(TARGET, 80, 40000, 0, port_scanner.SYN_ACK)
+    assert port_scanner.classify_syn_reply(packet, TARGET, 40000, secret) == (80, True)
+
+# Banner handling
+
+def test_decode_banner_returns_first_line():
+    assert port_scanner.decode_banner(b"\r\n  220 mail ESMTP Postfix\r\nmore\r\n") == "220 mail ESMTP Postfix"
+
+
+def test_decode_banner_ignores_invalid_utf8():
+    assert port_scanner.decode_banner(b"SSH-2.0-\xff\xfeX\r\n") == "SSH-2.0-X"
+
+
+@pytest.mark.parametrize("data", [b"", b"\r\n", b"   \n"])
+def test_decode_banner_empty(data):
+    assert port_scanner.decode_banner(data) is None
+
+
+@pytest.mark.parametrize("banner, service", [
+    ("SSH-2.0-OpenSSH_9.6", "SSH"),
+    ("HTTP/1.1 400 Bad Request", "HTTP"),
+    ("220 mail.example.com ESMTP Postfix", "SMTP"),
+    ("220 ProFTPD Server (FTP) ready", "FTP"),
+    ("+OK Dovecot ready.", "POP3"),
+    ("* OK [CAPABILITY IMAP4rev1] ready", "IMAP"),
+    ("RFB 003.008", "VNC"),
+    ("hello", None),
+    ("", None),
+    (None, None),
+])
+def test_identify_service(banner, service):
+    assert port_scanner.identify_service(banner) == service
+
+
+def test_truncate_banner():
+    assert port_scanner.truncate_banner(None) == "No banner"
+    assert port_scanner.truncate_banner("short") == "short"
+    assert port_scanner.truncate_banner("x" * 38) == "x" * 38
+    truncated = port_scanner.truncate_banner("x" * 50)
+    assert len(truncated) == 38 and truncated.endswith("...")
+
+
+# Descriptor budget
+
+@pytest.fixture
+def nofile_limit(monkeypatch):
+    """Sets the soft RLIMIT_NOFILE value seen by the scanner."""
+    if port_scanner.resource is None:
+        pytest.skip("resource module unavailable")
+
+    def set_limit(soft_limit):
+        monkeypatch.setattr(port_scanner.resource, 'getrlimit', lambda _: (soft_limit, soft_limit))
+    return set_limit
+
+
+def test_scan_fits_cache_and_connections_into_descriptor_budget(nofile_limit, banner_port, monkeypatch, capsys):
+    monkeypatch.setattr(port_scanner, '_SCAN_CORE', None)
+    port_scanner.grab_banner('127.0.0.1', banner_port)
+
+    async def instant_scan(target_ip, port, timeout=1.0):
+        return (port, False)
+
+    monkeypatch.setattr(port_scanner, 'scan_port_async', instant_scan)
+    nofile_limit(512)
+    budget = 512 - port_scanner.DESCRIPTOR_HEADROOM
+    port_scanner.scan_ports('127.0.0.1', list(range(20000, 21000)), 20000, cache_size=4000)
+    assert f"allows only {budget - budget // 4} concurrent" in capsys.readouterr().err
+
+    # A budget too small for any cache empties it before scanning
+    nofile_limit(port_scanner.DESCRIPTOR_HEADROOM + 3)
+    assert len(port_scanner._OPEN_SOCK_CACHE) == 1
+    port_scanner.scan_ports('127.0.0.1', [20000], 10)
+    assert not port_scanner._OPEN_SOCK_CACHE
+
+
+def test_descriptor_budget(nofile_limit):
+    nofile_limit(512)
+    assert port_scanner.descriptor_budget() == 512 - port_scanner.DESCRIPTOR_HEADROOM
+    nofile_limit(port_scanner.resource.RLIM_INFINITY)
+    assert port_scanner.descriptor_budget() is None
+
+
+# Loopback scans
+
+def test_scan_port_open_and_closed(banner_port, closed_port):
+    assert port_scanner.scan_port('127.0.0.1', banner_port) == (banner_port, True)
+    assert port_scanner.scan_port('127.0.0.1', closed_port) == (closed_port, False)
+
+
+def test_grab_banner_reuses_cached_connection(banner_port):
+    expected = (banner_port, True, "SSH", BANNER.decode().strip())
+    assert port_scanner.grab_banner('127.0.0.1', banner_port) == expected
+    assert port_scanner.get_cached_socket('127.0.0.1', banner_port) is not None
+    assert port_scanner.grab_banner('127.0.0.1', banner_port) == expected
+    assert len(port_scanner._OPEN_SOCK_CACHE) == 1
+
+
+def test_trim_socket_cache(banner_port):
+    port_scanner.grab_banner('127.0.0.1', banner_port)
+    port_scanner.trim_socket_cache(0)
+    assert not port_scanner._OPEN_SOCK_CACHE
+
+
+@pytest.mark.parametrize("native", [False, True], ids=["asyncio", "native"])
+def test_scan_ports_loopback(native, banner_port, closed_port, request, monkeypatch):
+    if native:
+        request.getfixturevalue('scan_core')
+    else:
+        monkeypatch.setattr(port_scanner, '_SCAN_CORE', None)
+    ports = [closed_port, banner_port]
+
+    # The second scan is answered from the connection cache
+    for _ in range(2):
+        results = port_scanner.scan_ports('127.0.0.1', ports, 10, timeout=1.0)
+        assert results == [
+            (closed_port, False, None, None),
+            (banner_port, True, "SSH", BANNER.decode().strip()),
+        ]
+
+
+
+@pytest.mark.parametrize("native", [False, True], ids=["asyncio", "native"])
+def test_scan_ports_keeps_input_order_and_repeats(native, banner_port, closed_port, request, monkeypatch, capsys):
+    if native:
+        request.getfixturevalue('scan_core')
+    else:
+        monkeypatch.setattr(port_scanner, '_SCAN_CORE', None)
+    ports = [banner_port, closed_port, banner_port, closed_port]
+
+    open_result = (banner_port, True, "SSH", BANNER.decode().strip())
+    closed_result = (closed_port, False, None, None)
+    results = port_scanner.scan_ports('127.0.0.1', ports, 10, timeout=1.0)
+    assert results == [open_result, closed_result, open_result, closed_result]
+    assert "2/2 ports scanned" in capsys.readouterr().err
+
+    port_scanner.display_results(results, '127.0.0.1', 0.1)
+    assert str(banner_port) in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("native", [False, True], ids=["asyncio", "native"])
+def test_scan_ports_reports_out_of_range_ports_closed(native, banner_port, request, monkeypatch):
+    if native:
+        request.getfixturevalue('scan_core')
+    else:
+        monkeypatch.setattr(port_scanner, '_SCAN_CORE', None)
+
+    results = port_scanner.scan_ports('127.0.0.1', [0, banner_port, 70000], 10, timeout=1.0)
+    assert results == [
+        (0, False, None, None),
+        (banner_port, True, "SSH", BANNER.decode().strip()),
+        (70000, False, None, None),
+    ]
+
+# Scan loop
+
+def test_task_connect_blocks_yields_bounded_blocks():
+    async def instant_scan(port):
+        return (port, port % 2 == 0)
+
+    async def collect(ports):
+        loop = port_scanner.asyncio.get_running_loop()
+        return [block async for block in port_scanner._task_connect_blocks(loop, ports, instant_scan)]
+
+    ports = list(range(1, 201))
+    blocks = port_scanner.get_scan_loop().run_until_complete(collect(ports))
+    assert all(0 < len(block) <= port_scanner.COMPLETION_BATCH_SIZE for block in blocks)
+    assert len(blocks[0]) == port_scanner.COMPLETION_BATCH_SIZE
+    assert sorted(result for block in blocks for result in block) == [(port, port % 2 == 0) for port in ports]
+
+
+def test_failed_scan_leaves_no_tasks_behind(closed_port, monkeypatch):
+    monkeypatch.setattr(port_scanner, '_SCAN_CORE', None)
+    probed = []
+
+    async def failing_scan(target_ip, port, timeout=1.0):
+        probed.append(port)
+        if port == 5:
+            raise OSError(errno.ENOMEM, "injected")
+        await port_scanner.asyncio.sleep(10)
+        return (port, False)
+
+    monkeypatch.setattr(port_scanner, 'scan_port_async', failing_scan)
+    with pytest.raises(OSError):
+        port_scanner.scan_ports('127.0.0.1', list(range(1, 301)), 10, timeout=1.0)
+    loop = port_scanner.get_scan_loop()
+    assert not port_scanner.asyncio.all_tasks(loop)
+
+    # The next scan on the shared loop probes only its own ports
+    monkeypatch.undo()
+    monkeypatch.setattr(port_scanner, '_SCAN_CORE', None)
+    probed.clear()
+    assert port_scanner.scan_ports('127.0.0.1', [closed_port], 10, timeout=1.0) == [
+        (closed_port, False, None, None)
+    ]
+    loop.run_until_complete(port_scanner.asyncio.sleep(0))
+    assert not probed
+
+
+
+def test_print_progress_writes_until_sentinel(capsys):
+    progress = port_scanner.queue.SimpleQueue()
+    for text in ("one\r", "two\r", None, "after\r"):
+        progress.put(text)
+    printer = threading.Thread(target=port_scanner.print_progress, args=(progress,))
+    printer.start()
+    printer.join(timeout=5)
+    assert not printer.is_alive()
+    assert capsys.readouterr().err == "one\rtwo\r"
+    assert progress.get_nowait() == "after\r"
+
+
+def test_failed_scan_stops_printer_thread(monkeypatch):
+    monkeypatch.setattr(port_scanner, '_SCAN_CORE', None)
+
+    async def failing_scan(target_ip, port, timeout=1.0):
+        raise OSError(errno.ENOMEM, "injected")
+
+    monkeypatch.setattr(port_scanner, 'scan_port_async', failing_scan)
+    threads_before = threading.active_count()
+    with pytest.raises(OSError):
+        port_scanner.scan_ports('127.0.0.1', [1, 2, 3], 10)
+    assert threading.active_count() == threads_before
+
+# Native scan core contract
+
+def test_scan_core_signature(scan_core):
+    assert scan_core.scan_ports.argtypes == [
+        ctypes.c_char_p, ctypes.POINTER(ctypes.c_int), ctypes.c_int,
+        ctypes.c_int, ctypes.c_int, ctypes.POINTER(ctypes.c_ubyte),
+    ]
+    assert scan_core.scan_ports.restype is ctypes.c_int
+
+
+def test_scan_core_status_bytes(scan_core, banner_port, closed_port):
+    ports = (ctypes.c_int * 2)(banner_port, closed_port)
+    states = (ctypes.c_ubyte * 2)(9, 9)
+    assert scan_core.scan_ports(b'127.0.0.1', ports, 2, 1000, 4, states) == 0
+    assert list(states) == [port_scanner.CORE_PORT_OPEN, port_scanner.CORE_PORT_CLOSED]
+
+
+def test_scan_ports_native(scan_core, banner_port, closed_port):
+    assert port_scanner.scan_ports_native('127.0.0.1', [banner_port, closed_port], 4) == [
+        (banner_port, True), (closed_port, False)
+    ]
+
+
+@pytest.mark.parametrize("target_ip, ports", [
+    ('127.0.0.1', [80, 70000]),
+    ('127.0.0.1', [0]),
+    ('127.0.0.1', [-1]),
+    ('not-an-ip', [80]),
+])
+def test_scan_ports_native_rejects_invalid_input(scan_core, target_ip, ports):
+    with pytest.raises(OSError) as excinfo:
+        port_scanner.scan_ports_native(target_ip, ports, 4)
+    assert excinfo.value.errno == errno.EINVAL
+
+
+def test_scan_core_reports_unscanned_when_out_of_descriptors(scan_core_path, banner_port):
+    # Exhausting descriptors is done in a child process so the test run keeps its own
+    script = textwrap.dedent(f"""
+        import resource, socket
+        import port_scanner
+        port_scanner.SCAN_CORE_PATH = {scan_core_path!r}
+        port_scanner._SCAN_CORE = port_scanner.load_scan_core()
+        resource.setrlimit(resource.RLIMIT_NOFILE, (64, 64))
+        held = []
+        try:
+            while True:
+                held.append(socket.socket())
+        except OSError:
+            pass
+        held.pop().close()  # for the core's epoll instance
+        print(port_scanner.scan_ports_native('127.0.0.1', [{banner_port}], 4))
+    """)
+    output = subprocess.run(
+        [sys.executable, '-c', script], capture_output=True, text=True, check=True,
+        cwd=port_scanner.os.path.dirname(port_scanner.__file__),
+    ).stdout
+    assert output.strip() == f"[({banner_port}, None)]"